@@ -1,8 +1,15 @@
+from typing import FrozenSet, Tuple
+
 import numpy as np
 
 from core.instance import Instance
+from core.matrix_assignment import matrix_average_travel_time
 from core.route import RouteSet
 from core.transit_graph import TransitGraph
+from core.zoning import Zoning
+
+
+ENGINES = ("dijkstra", "matrix")
 
 
 class Evaluator:
@@ -11,11 +18,21 @@ class Evaluator:
         instance: Instance,
         transfer_penalty: float = 5.0,
         unreachable_penalty: float = 1e4,
+        engine: str = "dijkstra",
+        verify: bool = False,
     ):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}, expected one of {ENGINES}")
+
         self.instance = instance
         self.transfer_penalty = transfer_penalty
         self.unreachable_penalty = unreachable_penalty
 
+        # "matrix": dense min-plus all-pairs ATT, for networks up to a few
+        # hundred stops; verify=True cross-checks it against Dijkstra
+        self.engine = engine
+        self.verify = verify
+
         # Map (u, v) -> travel_time
         self.edge_time = {
             (e.u, e.v): e.travel_time for e in instance.edges
@@ -42,6 +59,90 @@ class Evaluator:
         """
         ATT: demand-weighted average travel time.
         """
+        if self.engine == "dijkstra":
+            return self._att_dijkstra(route_set)
+
+        att = matrix_average_travel_time(
+            self.instance,
+            route_set,
+            transfer_penalty=self.transfer_penalty,
+            unreachable_penalty=self.unreachable_penalty,
+        )
+        if self.verify:
+            expected = self._att_dijkstra(route_set)
+            if not np.isclose(att, expected, rtol=1e-9, atol=1e-9):
+                raise RuntimeError(
+                    f"Matrix engine ATT {att} differs from Dijkstra ATT {expected}"
+                )
+        return att
+
+    def unserved_demand(self, route_set: RouteSet) -> float:
+        """
+        Share of OD demand that has no path on the route set (and is
+        therefore charged the unreachable penalty in ATT).
+        """
+        tg = TransitGraph(
+            self.instance,
+            route_set,
+            transfer_penalty=self.transfer_penalty,
+        )
+        demand = np.where(self.instance.demand > 0, self.instance.demand, 0.0)
+        np.fill_diagonal(demand, 0.0)
+
+        total_demand = demand.sum()
+        if total_demand == 0:
+            return 0.0
+
+        unserved = 0.0
+        for o in np.nonzero(demand.any(axis=1))[0]:
+            times, _ = tg.shortest_times_from(o + 1)
+            unserved += demand[o][np.isinf(times)].sum()
+        return unserved / total_demand
+
+    def origin_times(
+        self,
+        tg: TransitGraph,
+        origin: int,
+    ) -> Tuple[np.ndarray, FrozenSet[Tuple[int, ...]]]:
+        """
+        Shortest times from origin to every stop on a transit graph, and the
+        routes (as stop tuples) ridden by those best paths.
+        """
+        times, used = tg.shortest_times_from(origin)
+        routes = frozenset(
+            tuple(r.stops)
+            for r_idx, r in enumerate(tg.route_set.routes)
+            if used >> r_idx & 1
+        )
+        return times, routes
+
+    def att_from_times(self, times: np.ndarray) -> float:
+        """
+        ATT from a (n_stops, n_stops) matrix of stop-to-stop shortest times,
+        accumulated in the same order as the Dijkstra engine.
+        """
+        total_time = 0.0
+        total_demand = 0.0
+
+        for o in range(1, self.instance.n_stops + 1):
+            for d in range(1, self.instance.n_stops + 1):
+                q = self.instance.demand[o - 1, d - 1]
+                if q <= 0 or o == d:
+                    continue
+
+                t = times[o - 1, d - 1]
+                if t == float("inf"):
+                    t = self.unreachable_penalty
+
+                total_time += q * t
+                total_demand += q
+
+        if total_demand == 0:
+            return float("inf")
+
+        return total_time / total_demand
+
+    def _att_dijkstra(self, route_set: RouteSet) -> float:
         tg = TransitGraph(
             self.instance,
             route_set,
@@ -68,3 +169,20 @@ class Evaluator:
             return float("inf")
 
         return total_time / total_demand
+
+
+class CoarseEvaluator(Evaluator):
+    """
+    Scores stop-level route sets on the zone instance of a Zoning:
+    routes are mapped to zone sequences before ATT / TRT are computed.
+    """
+
+    def __init__(self, zoning: Zoning, **kwargs):
+        super().__init__(zoning.coarse, **kwargs)
+        self.zoning = zoning
+
+    def total_route_time(self, route_set: RouteSet) -> float:
+        return super().total_route_time(self.zoning.map_route_set(route_set))
+
+    def average_travel_time(self, route_set: RouteSet) -> float:
+        return super().average_travel_time(self.zoning.map_route_set(route_set))
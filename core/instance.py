@@ -1,6 +1,10 @@
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
 import numpy as np
 
+if TYPE_CHECKING:
+    from core.zoning import Zoning
+
 
 @dataclass(frozen=True)
 class Edge:
@@ -33,3 +37,20 @@ class Instance:
     @property
     def n_edges(self) -> int:
         return len(self.edges)
+
+    def coarsen(
+        self,
+        n_zones: int | None = None,
+        zone_of: list[int] | None = None,
+    ) -> "Zoning":
+        """
+        Aggregate stops into zones, either given explicitly (zone_of, the
+        1-based zone of each stop) or clustered into n_zones along short links.
+        """
+        from core.zoning import Zoning, cluster_stops
+
+        if zone_of is None:
+            if n_zones is None:
+                raise ValueError("Either n_zones or zone_of must be given")
+            zone_of = cluster_stops(self, n_zones)
+        return Zoning(self, list(zone_of))
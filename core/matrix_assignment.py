@@ -0,0 +1,111 @@
+from typing import Dict, Tuple
+
+import numpy as np
+
+from core.instance import Instance
+from core.route import RouteSet
+
+
+def route_node_matrix(
+    instance: Instance,
+    route_set: RouteSet,
+    transfer_penalty: float = 5.0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Dense travel-time matrix over route nodes (stop, route_index), the same
+    nodes and arcs as TransitGraph. Nodes are ordered by stop.
+    Returns (W, node_stop) where node_stop[i] is the stop of node i.
+    """
+    edge_time: Dict[Tuple[int, int], float] = {
+        (e.u, e.v): e.travel_time for e in instance.edges
+    }
+
+    nodes = sorted({
+        (stop, r_idx)
+        for r_idx, route in enumerate(route_set.routes)
+        for stop in route.stops
+    })
+    index = {node: i for i, node in enumerate(nodes)}
+
+    W = np.full((len(nodes), len(nodes)), np.inf)
+    np.fill_diagonal(W, 0.0)
+
+    # movement along routes
+    for r_idx, route in enumerate(route_set.routes):
+        for i in range(len(route.stops) - 1):
+            u = route.stops[i]
+            v = route.stops[i + 1]
+            if (u, v) not in edge_time:
+                raise ValueError(
+                    f"No edge ({u},{v}) in instance for route {r_idx}"
+                )
+            a = index[(u, r_idx)]
+            b = index[(v, r_idx)]
+            W[a, b] = min(W[a, b], edge_time[(u, v)])
+
+    # transfers between routes at the same stop
+    node_stop = np.array([stop for stop, _ in nodes], dtype=int)
+    same_stop = node_stop[:, None] == node_stop[None, :]
+    transfer = same_stop & ~np.eye(len(nodes), dtype=bool)
+    W[transfer] = np.minimum(W[transfer], transfer_penalty)
+
+    return W, node_stop
+
+
+def floyd_warshall(W: np.ndarray) -> np.ndarray:
+    """
+    All-pairs shortest times by min-plus relaxation through each pivot.
+    """
+    D = W.copy()
+    for k in range(D.shape[0]):
+        np.minimum(D, D[:, k, None] + D[None, k, :], out=D)
+    return D
+
+
+def all_pairs_stop_times(
+    instance: Instance,
+    route_set: RouteSet,
+    transfer_penalty: float = 5.0,
+) -> np.ndarray:
+    """
+    (n_stops, n_stops) matrix of shortest stop-to-stop travel times;
+    np.inf where a stop is not served or not reachable.
+    """
+    T = np.full((instance.n_stops, instance.n_stops), np.inf)
+
+    W, node_stop = route_node_matrix(instance, route_set, transfer_penalty)
+    if len(node_stop) == 0:
+        return T
+
+    D = floyd_warshall(W)
+
+    # nodes are sorted by stop, so each stop owns a contiguous block
+    stops, starts = np.unique(node_stop, return_index=True)
+    by_origin = np.minimum.reduceat(D, starts, axis=0)
+    by_pair = np.minimum.reduceat(by_origin, starts, axis=1)
+
+    idx = stops - 1
+    T[np.ix_(idx, idx)] = by_pair
+    return T
+
+
+def matrix_average_travel_time(
+    instance: Instance,
+    route_set: RouteSet,
+    transfer_penalty: float = 5.0,
+    unreachable_penalty: float = 1e4,
+) -> float:
+    """
+    ATT from the all-pairs matrix as one demand-weighted dot product.
+    """
+    T = all_pairs_stop_times(instance, route_set, transfer_penalty)
+    T[np.isinf(T)] = unreachable_penalty
+
+    Q = np.where(instance.demand > 0, instance.demand, 0.0)
+    np.fill_diagonal(Q, 0.0)
+
+    total_demand = Q.sum()
+    if total_demand == 0:
+        return float("inf")
+
+    return float(Q.ravel() @ T.ravel()) / total_demand
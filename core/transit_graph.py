@@ -1,6 +1,9 @@
 from typing import Dict, Tuple, List
 import heapq
 
+import numpy as np
+
+from core.bucket_queue import BucketQueue, integral_max_weight
 from core.instance import Instance
 from core.route import RouteSet
 
@@ -22,6 +25,17 @@ class TransitGraph:
         self.adj: Dict[Node, List[Tuple[Node, float]]] = {}
         self._build()
 
+        # Dial's bucket queue replaces the heap when all weights are small integers
+        self.max_weight = integral_max_weight(
+            [w for arcs in self.adj.values() for _, w in arcs]
+            + [self.transfer_penalty]
+        )
+        if self.max_weight is not None:
+            self._int_adj = {
+                node: [(nxt, int(w)) for nxt, w in arcs]
+                for node, arcs in self.adj.items()
+            }
+
     def _build(self) -> None:
         """
         Build transit graph from routes.
@@ -66,6 +80,9 @@ class TransitGraph:
         """
         Compute shortest travel time between two stops.
         """
+        if self.max_weight is not None:
+            return self._shortest_path_dial(origin, destination)
+
         pq: List[Tuple[float, Node]] = []
         dist: Dict[Node, float] = {}
 
@@ -76,17 +93,15 @@ class TransitGraph:
                 dist[node] = 0.0
                 heapq.heappush(pq, (0.0, node))
 
-        best = float("inf")
-
         while pq:
             cur_dist, node = heapq.heappop(pq)
             if cur_dist > dist.get(node, float("inf")):
                 continue
 
+            # pops come out in non-decreasing order: first hit is optimal
             stop, _ = node
             if stop == destination:
-                best = min(best, cur_dist)
-                continue
+                return cur_dist
 
             for nxt, w in self.adj.get(node, []):
                 nd = cur_dist + w
@@ -94,4 +109,97 @@ class TransitGraph:
                     dist[nxt] = nd
                     heapq.heappush(pq, (nd, nxt))
 
-        return best
+        return float("inf")
+
+    def _shortest_path_dial(self, origin: int, destination: int) -> float:
+        """
+        shortest_path with a bucket queue (small integer weights only, inlined).
+        """
+        n_buckets = self.max_weight + 1
+        buckets: List[List[Node]] = [[] for _ in range(n_buckets)]
+        dist: Dict[Node, int] = {}
+
+        for r_idx, route in enumerate(self.route_set.routes):
+            if origin in route.stops:
+                node = (origin, r_idx)
+                dist[node] = 0
+                buckets[0].append(node)
+        size = len(buckets[0])
+        cur_dist = 0
+
+        while size:
+            bucket = buckets[cur_dist % n_buckets]
+            while not bucket:
+                cur_dist += 1
+                bucket = buckets[cur_dist % n_buckets]
+            node = bucket.pop()
+            size -= 1
+            if cur_dist > dist[node]:
+                continue
+
+            # keys come out in non-decreasing order: first hit is optimal
+            stop, _ = node
+            if stop == destination:
+                return float(cur_dist)
+
+            for nxt, w in self._int_adj[node]:
+                nd = cur_dist + w
+                if nd < dist.get(nxt, nd + 1):
+                    dist[nxt] = nd
+                    buckets[nd % n_buckets].append(nxt)
+                    size += 1
+
+        return float("inf")
+
+    def shortest_times_from(self, origin: int) -> Tuple[np.ndarray, int]:
+        """
+        Shortest travel time from origin to every stop (np.inf if unreachable),
+        plus a bitmask of the route indices ridden by those best paths.
+        """
+        times = np.full(self.instance.n_stops, np.inf)
+        used = 0
+
+        if self.max_weight is not None:
+            adj = self._int_adj
+            pq = BucketQueue(self.max_weight)
+            push, pop = pq.push, pq.pop
+        else:
+            adj = self.adj
+            heap: List[Tuple[float, Node]] = []
+            pq = heap
+
+            def push(d, node):
+                heapq.heappush(heap, (d, node))
+
+            def pop():
+                return heapq.heappop(heap)
+
+        dist: Dict[Node, float] = {}
+        mask: Dict[Node, int] = {}
+        for r_idx, route in enumerate(self.route_set.routes):
+            if origin in route.stops:
+                node = (origin, r_idx)
+                dist[node] = 0
+                mask[node] = 0
+                push(0, node)
+
+        while pq:
+            cur_dist, node = pop()
+            if cur_dist > dist[node]:
+                continue
+
+            # first settled node of a stop carries its best time
+            stop, r_idx = node
+            if times[stop - 1] == np.inf:
+                times[stop - 1] = cur_dist
+                used |= mask[node]
+
+            for nxt, w in adj[node]:
+                nd = cur_dist + w
+                if nd < dist.get(nxt, float("inf")):
+                    dist[nxt] = nd
+                    # riding along route r_idx (not transferring) uses it
+                    mask[nxt] = mask[node] | (1 << r_idx if nxt[1] == r_idx else 0)
+                    push(nd, nxt)
+
+        return times, used
@@ -0,0 +1,108 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from core.instance import Edge, Instance
+from core.route import Route, RouteSet
+
+
+def cluster_stops(instance: Instance, n_zones: int) -> List[int]:
+    """
+    Single-linkage clustering of stops along the shortest links until
+    n_zones clusters remain (or the graph cannot be merged further).
+    Zones are capped at twice the average zone size to avoid chaining
+    everything into one giant zone.
+    Returns the 1-based zone of each stop, indexed by stop - 1.
+    """
+    if n_zones < 1:
+        raise ValueError(f"n_zones must be at least 1, got {n_zones}")
+
+    parent = list(range(instance.n_stops + 1))
+    size = [1] * (instance.n_stops + 1)
+    max_size = max(2, -(-2 * instance.n_stops // n_zones))
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    n_clusters = instance.n_stops
+    for e in sorted(instance.edges, key=lambda e: (e.travel_time, e.u, e.v)):
+        if n_clusters <= n_zones:
+            break
+        ru, rv = find(e.u), find(e.v)
+        if ru != rv and size[ru] + size[rv] <= max_size:
+            root, child = min(ru, rv), max(ru, rv)
+            parent[child] = root
+            size[root] += size[child]
+            n_clusters -= 1
+
+    # relabel roots 1..n in order of their smallest stop
+    labels: Dict[int, int] = {}
+    zone_of = []
+    for stop in range(1, instance.n_stops + 1):
+        root = find(stop)
+        labels.setdefault(root, len(labels) + 1)
+        zone_of.append(labels[root])
+    return zone_of
+
+
+@dataclass
+class Zoning:
+    """
+    Stop-to-zone mapping of an instance and the aggregated zone instance:
+    - zone links take the fastest stop link between two zones
+    - zone demand sums stop demand (intra-zone trips land on the diagonal
+      and are therefore ignored by ATT)
+    """
+    instance: Instance
+    zone_of: List[int]  # 1-based zone of each stop, indexed by stop - 1
+    coarse: Instance = field(init=False)
+
+    def __post_init__(self):
+        if len(self.zone_of) != self.instance.n_stops:
+            raise ValueError(
+                f"zone_of must list a zone for each of the {self.instance.n_stops} stops"
+            )
+        n_zones = max(self.zone_of)
+
+        zone_time: Dict[Tuple[int, int], float] = {}
+        for e in self.instance.edges:
+            zu = self.zone_of[e.u - 1]
+            zv = self.zone_of[e.v - 1]
+            if zu != zv:
+                zone_time[(zu, zv)] = min(zone_time.get((zu, zv), e.travel_time), e.travel_time)
+
+        zones = np.array(self.zone_of) - 1
+        demand = np.zeros((n_zones, n_zones))
+        np.add.at(demand, (zones[:, None], zones[None, :]), self.instance.demand)
+
+        self.coarse = Instance(
+            n_stops=n_zones,
+            edges=[Edge(zu, zv, t) for (zu, zv), t in sorted(zone_time.items())],
+            demand=demand,
+        )
+
+    @property
+    def n_zones(self) -> int:
+        return self.coarse.n_stops
+
+    def map_route(self, route: Route) -> Route | None:
+        """
+        Zone sequence of a route (consecutive repeats collapsed),
+        or None if the route stays inside one zone.
+        """
+        zones: List[int] = []
+        for stop in route.stops:
+            z = self.zone_of[stop - 1]
+            if not zones or zones[-1] != z:
+                zones.append(z)
+        if len(zones) < 2:
+            return None
+        return Route(zones)
+
+    def map_route_set(self, route_set: RouteSet) -> RouteSet:
+        mapped = (self.map_route(r) for r in route_set.routes)
+        return RouteSet([r for r in mapped if r is not None])
@@ -4,12 +4,12 @@ import numpy as np
 from core.instance import Edge, Instance
 from core.route import RouteSet
 from core.evaluator import Evaluator
-from generation.k_shortest import yen_k_shortest_paths
+from generation.k_shortest import yen_k_shortest_paths_multi
+from generation.reduction import reduce_candidates
 from optimization.greedy import GreedyOptimizer
-from experiments.plots import plot_att_vs_routes, plot_att_vs_trt
 from optimization.nsga2 import NSGA2Optimizer
-from experiments.plots import plot_pareto_front
-from experiments.plots import plot_att_trt_greedy_vs_nsga
+from optimization.archive import ParetoArchive
+from experiments.results_store import ResultsStore, front_record, solution_record
 
 
 def load_mandl_instance():
@@ -43,19 +43,10 @@ def load_mandl_instance():
     )
 
 
-def main():
-    print("MAIN STARTED")
-
-    print("Loading Mandl instance...")
-    instance = load_mandl_instance()
-    print("INSTANCE LOADED")
-
-    print(f"Stops: {instance.n_stops}")
-    print(f"Edges: {instance.n_edges}")
-
-
-    print("Generating candidate routes...")
-
+def generate_candidates(instance, k=3, n_pairs=30, verbose=False):
+    """
+    Reduced pool of Yen k-shortest paths for the n_pairs highest-demand OD pairs.
+    """
     pairs = []
     for o in range(1, instance.n_stops + 1):
         for d in range(1, instance.n_stops + 1):
@@ -64,22 +55,79 @@ def main():
                 pairs.append((q, o, d))
 
     pairs.sort(reverse=True)
-    pairs = pairs[:30]
+    pairs = pairs[:n_pairs]
+
+    # one batched Yen call per origin, results kept in pair order
+    targets = {}
+    for q, o, d in pairs:
+        targets.setdefault(o, []).append(d)
+    paths = {
+        o: yen_k_shortest_paths_multi(instance, source=o, targets=ds, k=k)
+        for o, ds in targets.items()
+    }
 
     candidates = []
     for q, o, d in pairs:
-        print(f"  OD {o} -> {d} (demand={q})")
-        routes = yen_k_shortest_paths(
-            instance,
-            source=o,
-            target=d,
-            k=3,
-        )
-        candidates.extend(routes)
- 
+        if verbose:
+            print(f"  OD {o} -> {d} (demand={q})")
+        candidates.extend(paths[o][d])
+
     unique = {tuple(r.stops): r for r in candidates}
     candidates = list(unique.values())
 
+    return reduce_candidates(instance, candidates)
+
+
+def greedy_path(evaluator, solution, lambda_trt=0.1, max_k=6):
+    """
+    Greedy solutions for k = 1..max_k routes, taken from one greedy solve
+    with max_routes=max_k. Greedy is prefix-consistent, so its first k
+    routes are the k-route solution.
+    """
+    return [
+        solution_record(
+            evaluator,
+            RouteSet(solution.routes[:k]),
+            k=k,
+            **{"lambda": lambda_trt},
+        )
+        for k in range(1, max_k + 1)
+    ]
+
+
+def render_plots(store: ResultsStore, run_id: str) -> None:
+    """
+    Render all figures of a stored run (no optimization involved).
+    """
+    from experiments.plots import (
+        plot_att_trt_greedy_vs_nsga,
+        plot_att_vs_routes,
+        plot_att_vs_trt,
+        plot_pareto_front,
+    )
+
+    plot_pareto_front(store, run_id)
+    plot_att_vs_routes(store, run_id)
+    plot_att_vs_trt(store, run_id)
+    plot_att_trt_greedy_vs_nsga(store, run_id)
+
+
+def main(resume=False):
+    print("MAIN STARTED")
+
+    print("Loading Mandl instance...")
+    instance = load_mandl_instance()
+    print("INSTANCE LOADED")
+
+    print(f"Stops: {instance.n_stops}")
+    print(f"Edges: {instance.n_edges}")
+
+
+    print("Generating candidate routes...")
+    candidates, reduction = generate_candidates(
+        instance, k=3, n_pairs=30, verbose=True
+    )
+    print(f"Candidate pool reduced: {reduction}")
     print(f"Candidate routes: {len(candidates)}")
 
     evaluator = Evaluator(instance, transfer_penalty=5.0)
@@ -99,11 +147,14 @@ def main():
         max_routes=10,
         pop_size=150,
         generations=200,
+        patience=30,
+        checkpoint_path="data/processed/nsga2_checkpoint.pkl",
+        archive=ParetoArchive(max_size=200),
     )
 
-    pareto = nsga.solve(candidates)
-
-    plot_pareto_front(pareto)
+    pareto = nsga.solve(candidates, resume=resume)
+    print(f"Generations run: {nsga.generations_run}")
+    print(f"Archived non-dominated solutions: {len(nsga.archive)}")
 
     print("\n=== PARETO FRONT (approx) ===")
     for i, ind in enumerate(pareto[:10], 1):
@@ -133,22 +184,16 @@ def main():
 
     print("Running greedy optimization...")
     solution = optimizer.solve(candidates)
-
-    att = evaluator.average_travel_time(solution)
-    trt = evaluator.total_route_time(solution)
+    greedy_record = solution_record(evaluator, solution, **{"lambda": optimizer.lambda_trt})
 
     print("\n=== FINAL SOLUTION ===")
     print(f"Number of routes: {len(solution.routes)}")
-    print(f"ATT: {att:.3f}")
-    print(f"TRT: {trt:.3f}")
+    print(f"ATT: {greedy_record['att']:.3f}")
+    print(f"TRT: {greedy_record['trt']:.3f}")
     print("Routes:")
     for i, r in enumerate(solution.routes, 1):
         print(f"{i}: {r.stops}")
 
-
-    plot_att_vs_routes(instance, candidates)
-    plot_att_vs_trt(instance, candidates)
-
     # =========================
     # Greedy: lambda sweep
     # =========================
@@ -157,19 +202,46 @@ def main():
     lambdas = [0.0, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0]
 
     for lam in lambdas:
-        optimizer = GreedyOptimizer(
+        # the main greedy solve already covers its own lambda
+        if lam == optimizer.lambda_trt:
+            greedy_points.append(greedy_record)
+            continue
+
+        sweep_optimizer = GreedyOptimizer(
             evaluator,
             lambda_trt=lam,
-            max_routes=6,
+            max_routes=optimizer.max_routes,
         )
-        sol = optimizer.solve(candidates)
-
-        att = evaluator.average_travel_time(sol)
-        trt = evaluator.total_route_time(sol)
+        sol = sweep_optimizer.solve(candidates)
 
-        greedy_points.append((lam, att, trt))
-    plot_att_trt_greedy_vs_nsga(pareto, greedy_points)
+        greedy_points.append(solution_record(evaluator, sol, **{"lambda": lam}))
 
+    # =========================
+    # Store results, then render figures from the store
+    # =========================
+    store = ResultsStore()
+    run_id = "mandl"
+    store.save(run_id, {
+        "meta": {
+            "instance": "mandl",
+            "n_candidates": len(candidates),
+            "transfer_penalty": evaluator.transfer_penalty,
+            "max_routes": nsga.max_routes,
+            "pop_size": nsga.pop_size,
+            "generations": nsga.generations,
+            "generations_run": nsga.generations_run,
+        },
+        "pareto": front_record(pareto),
+        "archive": front_record(nsga.archive.solutions()),
+        "greedy_path": greedy_path(
+            evaluator, solution,
+            lambda_trt=optimizer.lambda_trt, max_k=optimizer.max_routes,
+        ),
+        "greedy_lambda_sweep": greedy_points,
+    })
+    print(f"Results stored: {store.path(run_id)}")
+
+    render_plots(store, run_id)
 
 
 if __name__ == "__main__":
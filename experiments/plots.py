@@ -1,26 +1,24 @@
-import matplotlib.pyplot as plt
+from experiments.results_store import ResultsStore
 
-from core.evaluator import Evaluator
-from optimization.greedy import GreedyOptimizer
 
+def _pyplot():
+    """
+    Import pyplot on first use with a headless backend, so optimization-only
+    runs never pay the matplotlib import.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
 
-def plot_att_vs_routes(instance, candidates, lambda_trt=0.1, max_k=6):
-    evaluator = Evaluator(instance, transfer_penalty=5.0)
-
-    route_counts = []
-    att_values = []
 
-    for k in range(1, max_k + 1):
-        optimizer = GreedyOptimizer(
-            evaluator,
-            lambda_trt=lambda_trt,
-            max_routes=k,
-        )
-        solution = optimizer.solve(candidates)
+def plot_att_vs_routes(store: ResultsStore, run_id: str, path="att_vs_routes.png"):
+    path_points = store.load(run_id)["greedy_path"]
 
-        route_counts.append(k)
-        att_values.append(evaluator.average_travel_time(solution))
+    route_counts = [p["k"] for p in path_points]
+    att_values = [p["att"] for p in path_points]
 
+    plt = _pyplot()
     plt.figure()
     plt.scatter(route_counts, att_values)
     plt.xlabel("Number of routes")
@@ -28,84 +26,112 @@ def plot_att_vs_routes(instance, candidates, lambda_trt=0.1, max_k=6):
     plt.title("ATT vs Number of Routes")
     plt.grid(True)
     plt.tight_layout()
-    plt.savefig("att_vs_routes.png", dpi=200)
-    plt.show()
+    plt.savefig(path, dpi=200)
+    plt.close()
 
 
-def plot_att_vs_trt(instance, candidates, lambda_trt=0.1, max_k=6):
-    evaluator = Evaluator(instance, transfer_penalty=5.0)
-
-    atts = []
-    trts = []
-
-    for k in range(1, max_k + 1):
-        optimizer = GreedyOptimizer(
-            evaluator,
-            lambda_trt=lambda_trt,
-            max_routes=k,
-        )
-        solution = optimizer.solve(candidates)
+def plot_att_vs_trt(store: ResultsStore, run_id: str, path="att_vs_trt.png"):
+    path_points = store.load(run_id)["greedy_path"]
 
-        atts.append(evaluator.average_travel_time(solution))
-        trts.append(evaluator.total_route_time(solution))
+    atts = [p["att"] for p in path_points]
+    trts = [p["trt"] for p in path_points]
 
+    plt = _pyplot()
     plt.figure()
     plt.scatter(trts, atts)
-    for i, k in enumerate(range(1, max_k + 1)):
+    for p in path_points:
         plt.annotate(
-            f"k={k}",
-            (trts[i], atts[i]),
+            f"k={p['k']}",
+            (p["trt"], p["att"]),
             textcoords="offset points",
             xytext=(6, 6),
             ha="left",
             va="bottom",
         )
 
-
     plt.xlabel("Total Route Time (TRT)")
     plt.ylabel("Average Travel Time (ATT)")
     plt.title("ATT vs TRT trade-off")
     plt.grid(True)
     plt.tight_layout()
-    plt.savefig("att_vs_trt.png", dpi=200)
-    plt.show()
+    plt.savefig(path, dpi=200)
+    plt.close()
+
 
-def plot_pareto_front(pareto, greedy_solution=None):
+def plot_pareto_front(store: ResultsStore, run_id: str, path="pareto_front.png"):
     """
-    pareto: list[Individual] from NSGA-II
-    greedy_solution: RouteSet or None
+    NSGA-II front of a stored run, each point annotated with its route count.
     """
+    pareto = store.load(run_id)["pareto"]
 
-    atts = [ind.f1_att for ind in pareto]
-    trts = [ind.f2_trt for ind in pareto]
+    atts = [p["att"] for p in pareto]
+    trts = [p["trt"] for p in pareto]
 
+    plt = _pyplot()
     plt.figure()
     plt.scatter(trts, atts, label="NSGA-II Pareto", s=40)
 
-    for ind in pareto:
+    for p in pareto:
         plt.annotate(
-            str(len(ind.routes)),
-            (ind.f2_trt, ind.f1_att),
+            str(len(p["routes"])),
+            (p["trt"], p["att"]),
             textcoords="offset points",
             xytext=(4, 4),
             fontsize=8,
         )
 
-    if greedy_solution is not None:
-        plt.scatter(
-            greedy_solution.trt,
-            greedy_solution.att,
-            color="red",
-            marker="x",
-            s=80,
-            label="Greedy",
-        )
-
     plt.xlabel("Total Route Time (TRT)")
     plt.ylabel("Average Travel Time (ATT)")
     plt.title("Pareto front: NSGA-II")
     plt.legend()
     plt.grid(True)
     plt.tight_layout()
-    plt.show()
+    plt.savefig(path, dpi=200)
+    plt.close()
+
+
+def plot_att_trt_greedy_vs_nsga(
+    store: ResultsStore,
+    run_id: str,
+    path="att_trt_greedy_vs_nsga.png",
+):
+    """
+    NSGA-II front against the greedy lambda sweep of the same run.
+    """
+    record = store.load(run_id)
+    pareto = record["pareto"]
+    sweep = record["greedy_lambda_sweep"]
 
+    plt = _pyplot()
+    plt.figure()
+    plt.scatter(
+        [p["trt"] for p in pareto],
+        [p["att"] for p in pareto],
+        label="NSGA-II Pareto",
+        s=40,
+    )
+    plt.scatter(
+        [p["trt"] for p in sweep],
+        [p["att"] for p in sweep],
+        color="red",
+        marker="x",
+        s=80,
+        label="Greedy (lambda sweep)",
+    )
+    for p in sweep:
+        plt.annotate(
+            f"λ={p['lambda']}",
+            (p["trt"], p["att"]),
+            textcoords="offset points",
+            xytext=(6, -10),
+            fontsize=8,
+        )
+
+    plt.xlabel("Total Route Time (TRT)")
+    plt.ylabel("Average Travel Time (ATT)")
+    plt.title("ATT vs TRT: Greedy vs NSGA-II")
+    plt.legend()
+    plt.grid(True)
+    plt.tight_layout()
+    plt.savefig(path, dpi=200)
+    plt.close()
@@ -0,0 +1,72 @@
+import gzip
+import json
+import os
+from typing import List
+
+from core.evaluator import Evaluator
+from core.route import RouteSet
+
+
+def front_record(individuals) -> List[dict]:
+    """
+    Serializable (ATT, TRT, routes) entries of NSGA-II individuals.
+    """
+    return [
+        {
+            "att": float(ind.f1_att),
+            "trt": float(ind.f2_trt),
+            "routes": [list(r.stops) for r in ind.routes],
+        }
+        for ind in individuals
+    ]
+
+
+def solution_record(evaluator: Evaluator, route_set: RouteSet, **extra) -> dict:
+    """
+    Serializable entry of a single route set, plus any extra fields (k, lambda...).
+    """
+    return {
+        **extra,
+        "att": float(evaluator.average_travel_time(route_set)),
+        "trt": float(evaluator.total_route_time(route_set)),
+        "routes": [list(r.stops) for r in route_set.routes],
+    }
+
+
+class ResultsStore:
+    """
+    Directory of gzipped JSON run records (fronts, greedy paths, metadata),
+    one file per run id, so figures can be rendered without re-optimizing.
+    """
+
+    def __init__(self, root: str = "data/processed/results"):
+        self.root = root
+
+    def path(self, run_id: str) -> str:
+        return os.path.join(self.root, f"{run_id}.json.gz")
+
+    def exists(self, run_id: str) -> bool:
+        return os.path.exists(self.path(run_id))
+
+    def save(self, run_id: str, record: dict) -> str:
+        os.makedirs(self.root, exist_ok=True)
+        path = self.path(run_id)
+        tmp_path = path + ".tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(record, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        return path
+
+    def load(self, run_id: str) -> dict:
+        with gzip.open(self.path(run_id), "rt", encoding="utf-8") as f:
+            return json.load(f)
+
+    def run_ids(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        suffix = ".json.gz"
+        return sorted(
+            name[: -len(suffix)]
+            for name in os.listdir(self.root)
+            if name.endswith(suffix)
+        )
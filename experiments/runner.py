@@ -0,0 +1,271 @@
+import argparse
+import itertools
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Tuple
+
+from core.evaluator import ENGINES, Evaluator
+from core.instance import Instance
+from core.route import Route, RouteSet
+from experiments.mandl_experiment import generate_candidates, load_mandl_instance
+from experiments.results_store import ResultsStore, front_record
+from optimization.archive import ParetoArchive
+from optimization.nsga2 import NSGA2Optimizer, hypervolume_2d
+
+
+INSTANCES = {
+    "mandl": load_mandl_instance,
+}
+
+PoolKey = Tuple[str, int, int]  # (instance name, k, n_pairs)
+
+
+@dataclass(frozen=True)
+class RunConfig:
+    """
+    One NSGA-II run of the experiment grid.
+    """
+    instance: str
+    k: int
+    pop_size: int
+    generations: int
+    max_routes: int
+    transfer_penalty: float
+    n_pairs: int
+    patience: int | None
+    seed: int
+
+    @property
+    def run_id(self) -> str:
+        return (
+            f"{self.instance}_k{self.k}_n{self.n_pairs}_p{self.pop_size}"
+            f"_g{self.generations}_r{self.max_routes}_tp{self.transfer_penalty:g}"
+            f"_pat{self.patience}_s{self.seed}"
+        )
+
+    @property
+    def pool_key(self) -> PoolKey:
+        return (self.instance, self.k, self.n_pairs)
+
+    @property
+    def group(self) -> Tuple:
+        """
+        Config without the seed: runs in a group are aggregated together.
+        """
+        return (
+            self.instance, self.k, self.pop_size, self.generations,
+            self.max_routes, self.transfer_penalty, self.n_pairs, self.patience,
+        )
+
+
+def expand_grid(args: argparse.Namespace) -> List[RunConfig]:
+    return [
+        RunConfig(*values)
+        for values in itertools.product(
+            args.instance, args.k, args.pop_size, args.generations,
+            args.max_routes, args.transfer_penalty, [args.n_pairs],
+            [args.patience], args.seeds,
+        )
+    ]
+
+
+# per-worker state: compiled instances and candidate pools, shipped once
+_worker_pools: Dict[PoolKey, Tuple[Instance, List[Route]]] = {}
+_worker_store: ResultsStore | None = None
+_worker_engine = "dijkstra"
+
+
+def _init_worker(pools, store, engine) -> None:
+    global _worker_pools, _worker_store, _worker_engine
+    _worker_pools = pools
+    _worker_store = store
+    _worker_engine = engine
+
+
+def run_one(config: RunConfig) -> dict:
+    """
+    Run NSGA-II for one config in a worker and store its record.
+    """
+    instance, candidates = _worker_pools[config.pool_key]
+    evaluator = Evaluator(
+        instance,
+        transfer_penalty=config.transfer_penalty,
+        engine=_worker_engine,
+    )
+    nsga = NSGA2Optimizer(
+        evaluator=evaluator,
+        max_routes=config.max_routes,
+        pop_size=config.pop_size,
+        generations=config.generations,
+        seed=config.seed,
+        patience=config.patience,
+        archive=ParetoArchive(max_size=200),
+    )
+
+    start = time.perf_counter()
+    pareto = nsga.solve(candidates)
+    elapsed = time.perf_counter() - start
+
+    record = {
+        "meta": {
+            **asdict(config),
+            "n_candidates": len(candidates),
+            "generations_run": nsga.generations_run,
+            "seconds": elapsed,
+        },
+        "pareto": front_record(pareto),
+        "archive": front_record(nsga.archive.solutions()),
+    }
+    _worker_store.save(config.run_id, record)
+    return record
+
+
+def served_points(evaluator: Evaluator, entries: List[dict]) -> List[Tuple[float, float]]:
+    """
+    (ATT, TRT) of the stored entries whose routes give every OD pair a path.
+    """
+    return [
+        (p["att"], p["trt"])
+        for p in entries
+        if evaluator.unserved_demand(RouteSet([Route(stops) for stops in p["routes"]])) == 0
+    ]
+
+
+def summarize(configs: List[RunConfig], records: Dict[str, dict]) -> dict:
+    """
+    Per-group statistics over seeds. Hypervolumes in a group share one
+    reference point so seeds are comparable; only fully served archive
+    points count, so the unreachable penalty does not swamp the scale.
+    """
+    groups: Dict[Tuple, List[RunConfig]] = {}
+    for c in configs:
+        groups.setdefault(c.group, []).append(c)
+
+    evaluators: Dict[Tuple[str, float], Evaluator] = {}
+    summary = []
+    for group, members in groups.items():
+        key = (members[0].instance, members[0].transfer_penalty)
+        if key not in evaluators:
+            evaluators[key] = Evaluator(INSTANCES[key[0]](), transfer_penalty=key[1])
+
+        archives = [records[c.run_id]["archive"] for c in members]
+        fronts = [served_points(evaluators[key], archive) for archive in archives]
+        points = [pt for front in fronts for pt in front]
+        if points:
+            ref = (
+                max(att for att, _ in points) * 1.1,
+                max(trt for _, trt in points) * 1.1,
+            )
+            hvs = [hypervolume_2d(front, ref) for front in fronts]
+        else:
+            ref = None
+            hvs = [0.0] * len(fronts)
+        best_atts = [min(p["att"] for p in archive) for archive in archives]
+        seconds = [records[c.run_id]["meta"]["seconds"] for c in members]
+
+        summary.append({
+            **{k: v for k, v in asdict(members[0]).items() if k != "seed"},
+            "seeds": [c.seed for c in members],
+            "hv_reference": ref,
+            "hypervolume_mean": statistics.mean(hvs),
+            "hypervolume_std": statistics.pstdev(hvs),
+            "best_att_mean": statistics.mean(best_atts),
+            "best_att_min": min(best_atts),
+            "seconds_mean": statistics.mean(seconds),
+            "runs": [
+                {
+                    "run_id": c.run_id,
+                    "hypervolume": hv,
+                    "best_att": att,
+                    "front_size": len(archive),
+                    "served_front_size": len(front),
+                    "seconds": s,
+                }
+                for c, hv, att, archive, front, s in zip(
+                    members, hvs, best_atts, archives, fronts, seconds
+                )
+            ],
+        })
+    return {"groups": summary}
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run an NSGA-II experiment grid over configs and seeds.",
+    )
+    parser.add_argument("--instance", nargs="+", default=["mandl"], choices=sorted(INSTANCES))
+    parser.add_argument("--k", nargs="+", type=int, default=[3])
+    parser.add_argument("--pop-size", nargs="+", type=int, default=[150])
+    parser.add_argument("--generations", nargs="+", type=int, default=[200])
+    parser.add_argument("--max-routes", nargs="+", type=int, default=[10])
+    parser.add_argument("--transfer-penalty", nargs="+", type=float, default=[5.0])
+    parser.add_argument("--seeds", nargs="+", type=int, default=[42])
+    parser.add_argument("--n-pairs", type=int, default=30)
+    parser.add_argument("--patience", type=int, default=None)
+    parser.add_argument("--engine", default="dijkstra", choices=ENGINES)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--results-dir", default="data/processed/results")
+    parser.add_argument("--summary-id", default="summary")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> dict:
+    args = parse_args(argv)
+    store = ResultsStore(args.results_dir)
+    configs = expand_grid(args)
+
+    records: Dict[str, dict] = {}
+    pending = []
+    for c in configs:
+        if store.exists(c.run_id):
+            records[c.run_id] = store.load(c.run_id)
+        else:
+            pending.append(c)
+    print(f"Runs: {len(configs)} total, {len(configs) - len(pending)} already stored")
+
+    # compile each instance and candidate pool once, in the parent
+    pools: Dict[PoolKey, Tuple[Instance, List[Route]]] = {}
+    instances: Dict[str, Instance] = {}
+    for c in pending:
+        key = c.pool_key
+        if key in pools:
+            continue
+        if c.instance not in instances:
+            instances[c.instance] = INSTANCES[c.instance]()
+        candidates, reduction = generate_candidates(
+            instances[c.instance], k=c.k, n_pairs=c.n_pairs
+        )
+        print(f"Candidates {c.instance}, k={c.k}, {c.n_pairs} pairs: {reduction}")
+        pools[key] = (instances[c.instance], candidates)
+
+    if pending:
+        with ProcessPoolExecutor(
+            max_workers=args.workers,
+            initializer=_init_worker,
+            initargs=(pools, store, args.engine),
+        ) as executor:
+            for c, record in zip(pending, executor.map(run_one, pending)):
+                records[c.run_id] = record
+                print(
+                    f"  {c.run_id}: {len(record['pareto'])} front points, "
+                    f"{record['meta']['seconds']:.1f}s"
+                )
+
+    summary = summarize(configs, records)
+    store.save(args.summary_id, summary)
+
+    print("\n=== SUMMARY ===")
+    for g in summary["groups"]:
+        print(
+            f"{g['instance']} k={g['k']} pairs={g['n_pairs']} pop={g['pop_size']} "
+            f"gen={g['generations']} routes={g['max_routes']} "
+            f"tp={g['transfer_penalty']:g} patience={g['patience']} "
+            f"seeds={len(g['seeds'])}: "
+            f"HV={g['hypervolume_mean']:.4g}±{g['hypervolume_std']:.2g}, "
+            f"best ATT={g['best_att_min']:.3f}, {g['seconds_mean']:.1f}s/run"
+        )
+    print(f"Summary stored: {store.path(args.summary_id)}")
+    return summary
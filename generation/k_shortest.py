@@ -1,6 +1,8 @@
 import heapq
-from typing import Dict, List, Tuple
+from functools import partial
+from typing import Callable, Collection, Dict, Iterable, List, Tuple
 
+from core.bucket_queue import integral_max_weight
 from core.instance import Instance
 from core.route import Route
 
@@ -43,21 +45,178 @@ def _dijkstra(
     return None
 
 
-def yen_k_shortest_paths(
-    instance: Instance,
+def _dial(
+    adj: Dict[int, List[Tuple[int, int]]],
+    max_weight: int,
     source: int,
     target: int,
-    k: int,
-) -> List[Route]:
+    banned_edges: set[Tuple[int, int]] = set(),
+    banned_nodes: set[int] = set(),
+) -> List[int] | None:
     """
-    Yen's algorithm for K shortest loopless paths.
+    _dijkstra for small integer weights, using Dial's bucket queue (inlined).
+    """
+    n_buckets = max_weight + 1
+    buckets: List[List[int]] = [[] for _ in range(n_buckets)]
+    buckets[0].append(source)
+    size = 1
+    dist = 0
+    best: Dict[int, int] = {source: 0}
+    pred: Dict[int, int] = {}
+
+    while size:
+        bucket = buckets[dist % n_buckets]
+        while not bucket:
+            dist += 1
+            bucket = buckets[dist % n_buckets]
+        u = bucket.pop()
+        size -= 1
+        if dist > best[u]:
+            continue
+
+        if u == target:
+            path = [u]
+            while u != source:
+                u = pred[u]
+                path.append(u)
+            return path[::-1]
+
+        for v, w in adj.get(u, []):
+            if (u, v) in banned_edges:
+                continue
+            if v in banned_nodes:
+                continue
+            nd = dist + w
+            if nd < best.get(v, nd + 1):
+                best[v] = nd
+                pred[v] = u
+                buckets[nd % n_buckets].append(v)
+                size += 1
+
+    return None
+
+
+def _dijkstra_tree(
+    adj: Dict[int, List[Tuple[int, float]]],
+    source: int,
+    targets: Collection[int],
+    banned_edges: set[Tuple[int, int]] = set(),
+    banned_nodes: set[int] = set(),
+) -> Dict[int, List[int]]:
+    """
+    _dijkstra towards several targets: the path it would return for each
+    reachable target, from a single search that stops once all are settled.
+    """
+    pq = [(0.0, source, [source])]
+    best: Dict[int, float] = {}
+    paths: Dict[int, List[int]] = {}
+    pending = set(targets)
+
+    while pq and pending:
+        dist, u, path = heapq.heappop(pq)
+        if u in pending:
+            paths[u] = path
+            pending.discard(u)
+
+        if dist > best.get(u, float("inf")):
+            continue
+
+        for v, w in adj.get(u, []):
+            if (u, v) in banned_edges:
+                continue
+            if v in banned_nodes:
+                continue
+            nd = dist + w
+            if nd < best.get(v, float("inf")):
+                best[v] = nd
+                heapq.heappush(pq, (nd, v, path + [v]))
+
+    return paths
+
+
+def _dial_tree(
+    adj: Dict[int, List[Tuple[int, int]]],
+    max_weight: int,
+    source: int,
+    targets: Collection[int],
+    banned_edges: set[Tuple[int, int]] = set(),
+    banned_nodes: set[int] = set(),
+) -> Dict[int, List[int]]:
+    """
+    _dial towards several targets: the path it would return for each
+    reachable target, from a single search that stops once all are settled.
+    """
+    n_buckets = max_weight + 1
+    buckets: List[List[int]] = [[] for _ in range(n_buckets)]
+    buckets[0].append(source)
+    size = 1
+    dist = 0
+    best: Dict[int, int] = {source: 0}
+    pred: Dict[int, int] = {}
+    paths: Dict[int, List[int]] = {}
+    pending = set(targets)
+
+    while size and pending:
+        bucket = buckets[dist % n_buckets]
+        while not bucket:
+            dist += 1
+            bucket = buckets[dist % n_buckets]
+        u = bucket.pop()
+        size -= 1
+        if dist > best[u]:
+            continue
+
+        if u in pending:
+            pending.discard(u)
+            path = [u]
+            while path[-1] != source:
+                path.append(pred[path[-1]])
+            paths[u] = path[::-1]
+
+        for v, w in adj.get(u, []):
+            if (u, v) in banned_edges:
+                continue
+            if v in banned_nodes:
+                continue
+            nd = dist + w
+            if nd < best.get(v, nd + 1):
+                best[v] = nd
+                pred[v] = u
+                buckets[nd % n_buckets].append(v)
+                size += 1
+
+    return paths
+
+
+def _search_backends(instance: Instance):
+    """
+    (adj, point-to-point search, shortest-path-tree search) for an instance;
+    integer travel times use the bucket-queue variants.
     """
     adj = _build_adj(instance)
+    max_weight = integral_max_weight(e.travel_time for e in instance.edges)
+    if max_weight is None:
+        return adj, partial(_dijkstra, adj), partial(_dijkstra_tree, adj)
+
+    int_adj = {u: [(v, int(w)) for v, w in arcs] for u, arcs in adj.items()}
+    return (
+        adj,
+        partial(_dial, int_adj, max_weight),
+        partial(_dial_tree, int_adj, max_weight),
+    )
 
+
+def _yen(
+    adj: Dict[int, List[Tuple[int, float]]],
+    search: Callable[..., List[int] | None],
+    source: int,
+    target: int,
+    k: int,
+) -> List[Route]:
     A: List[List[int]] = []
     B: List[Tuple[float, List[int]]] = []
 
-    first = _dijkstra(adj, source, target)
+    first = search(source, target)
     if first is None:
         return []
 
@@ -75,8 +234,7 @@ def yen_k_shortest_paths(
                 if p[: i + 1] == root_path and i + 1 < len(p):
                     banned_edges.add((p[i], p[i + 1]))
 
-            spur_path = _dijkstra(
-                adj,
+            spur_path = search(
                 spur_node,
                 target,
                 banned_edges=banned_edges,
@@ -104,4 +262,72 @@ def yen_k_shortest_paths(
         _, next_path = heapq.heappop(B)
         A.append(next_path)
 
-    return [Route(p) for p in A]
+    return [Route(list(p)) for p in A]
+
+
+def yen_k_shortest_paths(
+    instance: Instance,
+    source: int,
+    target: int,
+    k: int,
+) -> List[Route]:
+    """
+    Yen's algorithm for K shortest loopless paths.
+    """
+    adj, search, _ = _search_backends(instance)
+    return _yen(adj, search, source, target, k)
+
+
+def yen_k_shortest_paths_multi(
+    instance: Instance,
+    source: int,
+    targets: Iterable[int],
+    k: int,
+) -> Dict[int, List[Route]]:
+    """
+    yen_k_shortest_paths from one source to several targets.
+
+    The unrestricted search from the source runs once, until every target is
+    settled, and supplies each target's first path. Spur searches are
+    point-to-point (with early exit) and memoized by
+    (spur node, target, banned edges, banned nodes). When a second target
+    needs a spur search with the same spur node and restrictions (their root
+    paths coincide), it is rerun once as a multi-target search over the
+    targets not yet processed, which then serves all of them. Results are
+    identical to calling the per-pair function.
+    """
+    targets = list(targets)
+    remaining = targets
+    adj, point_search, tree_search = _search_backends(instance)
+    trees = {(source, frozenset(), frozenset()): tree_search(source, targets)}
+    first_target: Dict[tuple, int] = {}
+    results: Dict[tuple, List[int] | None] = {}
+
+    def search(spur, target, banned_edges=frozenset(), banned_nodes=frozenset()):
+        tree_key = (spur, frozenset(banned_edges), frozenset(banned_nodes))
+        if tree_key in trees:
+            return trees[tree_key].get(target)
+        if first_target.setdefault(tree_key, target) != target:
+            trees[tree_key] = tree_search(
+                spur,
+                remaining,
+                banned_edges=banned_edges,
+                banned_nodes=banned_nodes,
+            )
+            return trees[tree_key].get(target)
+
+        key = (target, *tree_key)
+        if key not in results:
+            results[key] = point_search(
+                spur,
+                target,
+                banned_edges=banned_edges,
+                banned_nodes=banned_nodes,
+            )
+        return results[key]
+
+    paths: Dict[int, List[Route]] = {}
+    for i, t in enumerate(targets):
+        remaining = targets[i:]
+        paths[t] = _yen(adj, search, source, t, k)
+    return paths
@@ -0,0 +1,115 @@
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from core.instance import Instance
+from core.route import Route
+
+
+@dataclass
+class ReductionReport:
+    """
+    How many candidates each reduction step removed.
+    """
+    n_input: int
+    n_subpaths: int
+    n_low_demand: int
+    n_clustered: int
+
+    @property
+    def n_output(self) -> int:
+        return self.n_input - self.n_subpaths - self.n_low_demand - self.n_clustered
+
+    @property
+    def shrinkage(self) -> float:
+        """
+        Fraction of the input pool that was removed.
+        """
+        if self.n_input == 0:
+            return 0.0
+        return 1.0 - self.n_output / self.n_input
+
+    def __str__(self) -> str:
+        return (
+            f"{self.n_input} -> {self.n_output} candidates "
+            f"({self.shrinkage:.0%} removed: {self.n_subpaths} sub-paths, "
+            f"{self.n_low_demand} low-demand, {self.n_clustered} near-duplicates)"
+        )
+
+
+def served_demand(instance: Instance, route: Route) -> float:
+    """
+    Demand between stop pairs the route connects directly (in travel direction).
+    """
+    stops = route.stops
+    total = 0.0
+    for i in range(len(stops) - 1):
+        for j in range(i + 1, len(stops)):
+            total += instance.demand[stops[i] - 1, stops[j] - 1]
+    return total
+
+
+def stop_overlap(a: Route, b: Route) -> float:
+    """
+    Jaccard overlap of the stop sets of two routes, or 0 if they run
+    through their shared stops in different orders.
+    """
+    set_a = set(a.stops)
+    set_b = set(b.stops)
+    shared_a = [s for s in a.stops if s in set_b]
+    shared_b = [s for s in b.stops if s in set_a]
+    if shared_a != shared_b:
+        return 0.0
+    return len(shared_a) / len(set_a | set_b)
+
+
+def reduce_candidates(
+    instance: Instance,
+    candidates: List[Route],
+    min_demand_share: float = 0.001,
+    overlap_threshold: float = 0.8,
+) -> Tuple[List[Route], ReductionReport]:
+    """
+    Shrink a candidate pool before optimization:
+    1. drop routes that are strict contiguous sub-paths of another candidate,
+    2. drop routes serving less than min_demand_share of total demand,
+    3. cluster routes whose stop overlap reaches overlap_threshold and keep
+       the one serving the most demand from each cluster.
+    Input order is preserved among the kept routes.
+    """
+    # 1. sub-paths
+    proper_subpaths = set()
+    for r in candidates:
+        stops = tuple(r.stops)
+        n = len(stops)
+        for i in range(n - 1):
+            for j in range(i + 2, n + 1):
+                if j - i < n:
+                    proper_subpaths.add(stops[i:j])
+
+    kept = [r for r in candidates if tuple(r.stops) not in proper_subpaths]
+    n_subpaths = len(candidates) - len(kept)
+
+    # 2. negligible demand
+    served = {id(r): served_demand(instance, r) for r in kept}
+    min_served = min_demand_share * instance.demand.sum()
+    n_before = len(kept)
+    kept = [r for r in kept if served[id(r)] > 0 and served[id(r)] >= min_served]
+    n_low_demand = n_before - len(kept)
+
+    # 3. leader clustering, best-served routes become leaders first
+    leaders: List[Route] = []
+    for r in sorted(kept, key=lambda r: served[id(r)], reverse=True):
+        if all(stop_overlap(r, leader) < overlap_threshold for leader in leaders):
+            leaders.append(r)
+
+    leader_ids = {id(r) for r in leaders}
+    reduced = [r for r in kept if id(r) in leader_ids]
+    n_clustered = len(kept) - len(reduced)
+
+    report = ReductionReport(
+        n_input=len(candidates),
+        n_subpaths=n_subpaths,
+        n_low_demand=n_low_demand,
+        n_clustered=n_clustered,
+    )
+    return reduced, report
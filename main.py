@@ -0,0 +1,5 @@
+from experiments.runner import main
+
+
+if __name__ == "__main__":
+    main()
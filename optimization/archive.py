@@ -0,0 +1,86 @@
+from bisect import bisect_left, bisect_right
+from dataclasses import replace
+from typing import List, Tuple
+
+
+class ParetoArchive:
+    """
+    External archive of non-dominated (ATT, TRT) solutions.
+
+    Entries are kept sorted by ATT ascending, which for a non-dominated set
+    means TRT strictly descending, so dominance checks are binary searches.
+    """
+
+    def __init__(self, max_size: int | None = None):
+        if max_size is not None and max_size < 2:
+            raise ValueError("Archive size bound must keep both extremes (>= 2)")
+        self.max_size = max_size
+        self._att: List[float] = []
+        self._neg_trt: List[float] = []  # ascending, mirrors _att order
+        self._items: list = []
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add(self, ind) -> bool:
+        """
+        Insert an evaluated individual unless it is weakly dominated.
+        Returns True if the archive changed.
+        """
+        att, trt = ind.f1_att, ind.f2_trt
+        lo = bisect_left(self._att, att)
+
+        # closest entry with smaller ATT has the smallest TRT among them
+        if lo > 0 and -self._neg_trt[lo - 1] <= trt:
+            return False
+        if lo < len(self._att) and self._att[lo] == att and -self._neg_trt[lo] <= trt:
+            return False
+
+        # entries from lo on have ATT >= att; dominated ones have TRT >= trt
+        hi = bisect_right(self._neg_trt, -trt, lo)
+        del self._att[lo:hi]
+        del self._neg_trt[lo:hi]
+        del self._items[lo:hi]
+
+        self._att.insert(lo, att)
+        self._neg_trt.insert(lo, -trt)
+        # archived copies drop lineage-aware evaluation state (times, used)
+        self._items.insert(lo, replace(
+            ind, routes=list(ind.routes), times=None, used=None, parents=(),
+        ))
+
+        if self.max_size is not None and len(self._items) > self.max_size:
+            self._prune()
+        return True
+
+    def _prune(self) -> None:
+        """
+        Drop the interior entry with the smallest crowding distance.
+        """
+        att_range = (self._att[-1] - self._att[0]) or 1.0
+        trt_range = (self._neg_trt[-1] - self._neg_trt[0]) or 1.0
+
+        worst = None
+        worst_crowding = float("inf")
+        for i in range(1, len(self._items) - 1):
+            crowding = (
+                (self._att[i + 1] - self._att[i - 1]) / att_range
+                + (self._neg_trt[i + 1] - self._neg_trt[i - 1]) / trt_range
+            )
+            if crowding < worst_crowding:
+                worst_crowding = crowding
+                worst = i
+
+        if worst is not None:
+            del self._att[worst]
+            del self._neg_trt[worst]
+            del self._items[worst]
+
+    def solutions(self) -> list:
+        """
+        Archived individuals sorted by ATT ascending.
+        """
+        return list(self._items)
+
+    def points(self) -> List[Tuple[float, float]]:
+        return [(a, -t) for a, t in zip(self._att, self._neg_trt)]
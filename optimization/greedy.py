@@ -1,19 +1,49 @@
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Callable
 
 from core.route import Route, RouteSet
 from core.evaluator import Evaluator
 
 
+# per-worker state: the optimizer (instance, evaluator) and the candidate pool
+_worker_optimizer = None
+_worker_candidates: List[Route] = []
+
+
+def _init_worker(optimizer: "GreedyOptimizer", candidates: List[Route]) -> None:
+    global _worker_optimizer, _worker_candidates
+    _worker_optimizer = optimizer
+    _worker_candidates = candidates
+
+
+def _score_chunk(args) -> List[float]:
+    selected_idx, trial_idx = args
+    selected = [_worker_candidates[i] for i in selected_idx]
+    return [
+        _worker_optimizer.objective(RouteSet(selected + [_worker_candidates[i]]))
+        for i in trial_idx
+    ]
+
+
 class GreedyOptimizer:
     def __init__(
         self,
         evaluator: Evaluator,
         lambda_trt: float = 0.1,
         max_routes: int = 10,
+        n_workers: int = 1,
+        coarse_evaluator: Evaluator | None = None,
+        refine_fraction: float = 0.5,
     ):
         self.evaluator = evaluator
         self.lambda_trt = lambda_trt
         self.max_routes = max_routes
+        self.n_workers = n_workers
+
+        # coarse-to-fine: each round only the best refine_fraction of trials
+        # on the coarse evaluator are scored with the full evaluator
+        self.coarse_evaluator = coarse_evaluator
+        self.refine_fraction = refine_fraction
 
     def objective(self, route_set: RouteSet) -> float:
         """
@@ -23,32 +53,96 @@ class GreedyOptimizer:
         trt = self.evaluator.total_route_time(route_set)
         return att + self.lambda_trt * trt
 
+    def shortlist(
+        self,
+        selected: List[int],
+        remaining: List[int],
+        candidates: List[Route],
+    ) -> List[int]:
+        """
+        Remaining candidate indices worth a full evaluation this round,
+        in candidate order.
+        """
+        if self.coarse_evaluator is None:
+            return remaining
+
+        sel = [candidates[i] for i in selected]
+        coarse = {}
+        for i in remaining:
+            trial = RouteSet(sel + [candidates[i]])
+            coarse[i] = (
+                self.coarse_evaluator.average_travel_time(trial)
+                + self.lambda_trt * self.coarse_evaluator.total_route_time(trial)
+            )
+
+        n_keep = max(1, round(self.refine_fraction * len(remaining)))
+        keep = set(sorted(remaining, key=lambda i: coarse[i])[:n_keep])
+        return [i for i in remaining if i in keep]
+
+    def score_round(
+        self,
+        selected: List[int],
+        remaining: List[int],
+        candidates: List[Route],
+        pool: ProcessPoolExecutor | None = None,
+    ) -> List[float]:
+        """
+        Objective of selected + [r] for every remaining candidate index r.
+        """
+        if pool is None:
+            sel = [candidates[i] for i in selected]
+            return [self.objective(RouteSet(sel + [candidates[i]])) for i in remaining]
+
+        n_chunks = self.n_workers * 4
+        size = max(1, -(-len(remaining) // n_chunks))
+        chunks = [
+            (selected, remaining[i:i + size])
+            for i in range(0, len(remaining), size)
+        ]
+        values: List[float] = []
+        for chunk_values in pool.map(_score_chunk, chunks):
+            values.extend(chunk_values)
+        return values
+
     def solve(self, candidates: List[Route]) -> RouteSet:
         """
         Greedy selection of routes from candidate pool.
+        With n_workers > 1 each round's trials are scored in worker processes;
+        ties are broken by candidate order exactly as in the serial loop.
         """
-        selected: List[Route] = []
-        remaining = list(candidates)
+        pool = None
+        if self.n_workers > 1:
+            pool = ProcessPoolExecutor(
+                max_workers=self.n_workers,
+                initializer=_init_worker,
+                initargs=(self, list(candidates)),
+            )
 
-        best_value = float("inf")
+        selected: List[int] = []
+        remaining = list(range(len(candidates)))
 
-        while remaining and len(selected) < self.max_routes:
-            best_route = None
-            best_new_value = best_value
+        best_value = float("inf")
 
-            for r in remaining:
-                trial = RouteSet(selected + [r])
-                val = self.objective(trial)
+        try:
+            while remaining and len(selected) < self.max_routes:
+                best_idx = None
+                best_new_value = best_value
 
-                if val < best_new_value:
-                    best_new_value = val
-                    best_route = r
+                trials = self.shortlist(selected, remaining, candidates)
+                values = self.score_round(selected, trials, candidates, pool)
+                for i, val in zip(trials, values):
+                    if val < best_new_value:
+                        best_new_value = val
+                        best_idx = i
 
-            if best_route is None:
-                break
+                if best_idx is None:
+                    break
 
-            selected.append(best_route)
-            remaining.remove(best_route)
-            best_value = best_new_value
+                selected.append(best_idx)
+                remaining.remove(best_idx)
+                best_value = best_new_value
+        finally:
+            if pool is not None:
+                pool.shutdown()
 
-        return RouteSet(selected)
+        return RouteSet([candidates[i] for i in selected])
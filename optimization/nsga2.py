@@ -1,9 +1,15 @@
+import os
+import pickle
 import random
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import Dict, FrozenSet, List, Tuple
+
+import numpy as np
 
 from core.route import Route, RouteSet
-from core.evaluator import Evaluator
+from core.evaluator import CoarseEvaluator, Evaluator
+from core.transit_graph import TransitGraph
+from optimization.archive import ParetoArchive
 
 
 @dataclass
@@ -13,6 +19,11 @@ class Individual:
     f2_trt: float | None = None
     rank: int | None = None
     crowding: float = 0.0
+    # lineage-aware evaluation state: per-origin shortest times, the routes
+    # their best paths ride, and the parents a child was produced from
+    times: np.ndarray | None = None
+    used: List[FrozenSet[Tuple[int, ...]]] | None = None
+    parents: tuple = ()
 
     def as_routeset(self) -> RouteSet:
         return RouteSet(self.routes)
@@ -82,6 +93,27 @@ def crowding_distance(front: List[Individual]) -> None:
             front[i].crowding += (front[i + 1].f2_trt - front[i - 1].f2_trt) / (fmax - fmin)
 
 
+def hypervolume_2d(points: List[Tuple[float, float]], ref: Tuple[float, float]) -> float:
+    """
+    Area dominated by (ATT, TRT) points and bounded by the reference point.
+    """
+    hv = 0.0
+    prev_f2 = ref[1]
+    for f1, f2 in sorted(points):
+        if f1 >= ref[0] or f2 >= prev_f2:
+            continue
+        hv += (ref[0] - f1) * (prev_f2 - f2)
+        prev_f2 = f2
+    return hv
+
+
+def route_key(routes: List[Route]) -> Tuple[Tuple[int, ...], ...]:
+    """
+    Order-independent key of a route set (used by the evaluation cache).
+    """
+    return tuple(sorted(tuple(r.stops) for r in routes))
+
+
 def tournament_select(pop: List[Individual]) -> Individual:
     a = random.choice(pop)
     b = random.choice(pop)
@@ -145,6 +177,16 @@ class NSGA2Optimizer:
         crossover_rate: float = 0.9,
         mutation_rate: float = 0.4,
         seed: int = 42,
+        patience: int | None = None,
+        hv_tol: float = 1e-4,
+        hv_reference: Tuple[float, float] | None = None,
+        checkpoint_path: str | None = None,
+        checkpoint_every: int = 10,
+        archive: ParetoArchive | None = None,
+        coarse_evaluator: Evaluator | None = None,
+        refine_fraction: float = 0.5,
+        incremental: bool = False,
+        verify_incremental: bool = False,
     ):
         self.evaluator = evaluator
         self.max_routes = max_routes
@@ -152,12 +194,272 @@ class NSGA2Optimizer:
         self.generations = generations
         self.crossover_rate = crossover_rate
         self.mutation_rate = mutation_rate
+        self.seed = seed
+
+        # early stopping: stop once the hypervolume of the first front
+        # improved by less than hv_tol (relative) over `patience` generations.
+        # Without an explicit hv_reference it is derived from fully served
+        # solutions, so the unreachable penalty does not swamp the scale.
+        self.patience = patience
+        self.hv_tol = hv_tol
+        self.hv_reference = hv_reference
+        self.hv_history: List[float] = []
+        self.served: Dict[Tuple[Tuple[int, ...], ...], bool] = {}
+
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_every = checkpoint_every
+        self.generations_run = 0
+
+        # every evaluated individual is offered to the external archive
+        self.archive = archive
+
+        # coarse-to-fine: offspring are screened on a cheap (e.g. zone-level)
+        # evaluator and only the best refine_fraction get full evaluation
+        self.coarse_evaluator = coarse_evaluator
+        self.refine_fraction = refine_fraction
+
+        # lineage-aware ATT: children reuse a parent's per-origin times and
+        # only recompute origins affected by removed or added routes;
+        # verify_incremental checks each value against a full evaluation.
+        # It replaces per-origin Dijkstra, so it only speeds up that engine.
+        if incremental and evaluator.engine != "dijkstra":
+            raise ValueError(
+                f"incremental evaluation requires the dijkstra engine, got {evaluator.engine!r}"
+            )
+        self.incremental = incremental
+        self.verify_incremental = verify_incremental
+
+        # origins without demand never contribute to ATT
+        demand = np.where(evaluator.instance.demand > 0, evaluator.instance.demand, 0.0)
+        np.fill_diagonal(demand, 0.0)
+        self.demand_origins = [int(o) + 1 for o in np.nonzero(demand.any(axis=1))[0]]
+
+        # route_key -> (ATT, TRT)
+        self.cache: Dict[Tuple[Tuple[int, ...], ...], Tuple[float, float]] = {}
         random.seed(seed)
 
     def evaluate(self, ind: Individual) -> None:
+        key = route_key(ind.routes)
+        if key not in self.cache:
+            rs = ind.as_routeset()
+            if self.incremental:
+                att = self.evaluate_lineage(ind)
+            else:
+                att = self.evaluator.average_travel_time(rs)
+            self.cache[key] = (att, self.evaluator.total_route_time(rs))
+        ind.f1_att, ind.f2_trt = self.cache[key]
+        if self.incremental and ind.times is None:
+            # cache hits (unchanged copies) inherit a same-route parent's state
+            for p in ind.parents:
+                if p.times is not None and route_key(p.routes) == key:
+                    ind.times, ind.used = p.times, p.used
+                    break
+        ind.parents = ()
+        if self.archive is not None:
+            self.archive.add(ind)
+
+    def improved_by(self, row: np.ndarray, origin: int, route: Route) -> bool:
+        """
+        Whether riding an added route can beat the parent's times from origin
+        at any of its stops (boarding at the origin for free, elsewhere
+        after a transfer). If not, no path through it is shorter.
+        """
+        arrival = float("inf")
+        for j, stop in enumerate(route.stops):
+            if j > 0:
+                arrival += self.evaluator.edge_time[(route.stops[j - 1], stop)]
+            if stop == origin:
+                arrival = 0.0
+            else:
+                arrival = min(arrival, row[stop - 1] + self.evaluator.transfer_penalty)
+            if arrival < row[stop - 1]:
+                return True
+        return False
+
+    def evaluate_lineage(self, ind: Individual) -> float:
+        """
+        ATT of ind, recomputing only origins whose best paths rode a route the
+        parent had but ind dropped, or that an added route can improve.
+        Also stores the per-origin state on ind for its own children.
+        """
+        n = self.evaluator.instance.n_stops
         rs = ind.as_routeset()
-        ind.f1_att = self.evaluator.average_travel_time(rs)
-        ind.f2_trt = self.evaluator.total_route_time(rs)
+        tg = TransitGraph(
+            self.evaluator.instance,
+            rs,
+            transfer_penalty=self.evaluator.transfer_penalty,
+        )
+        child_keys = {tuple(r.stops) for r in ind.routes}
+
+        origins = self.demand_origins
+
+        parents = [p for p in ind.parents if p.times is not None]
+        if parents:
+            parent = max(
+                parents,
+                key=lambda p: len(child_keys & {tuple(r.stops) for r in p.routes}),
+            )
+            parent_keys = {tuple(r.stops) for r in parent.routes}
+            removed = parent_keys - child_keys
+            added = [r for r in ind.routes if tuple(r.stops) not in parent_keys]
+
+            times = parent.times.copy()
+            used = list(parent.used)
+            origins = [
+                o for o in origins
+                if used[o - 1] & removed
+                or any(self.improved_by(times[o - 1], o, r) for r in added)
+            ]
+        else:
+            times = np.full((n, n), np.inf)
+            used = [frozenset()] * n
+
+        for o in origins:
+            times[o - 1], used[o - 1] = self.evaluator.origin_times(tg, o)
+
+        ind.times = times
+        ind.used = used
+        att = self.evaluator.att_from_times(times)
+
+        if self.verify_incremental:
+            expected = self.evaluator.average_travel_time(rs)
+            if not np.isclose(att, expected, rtol=1e-9, atol=1e-9):
+                raise RuntimeError(
+                    f"Lineage-aware ATT {att} differs from full ATT {expected}"
+                )
+        return att
+
+    def screen(self, offspring: List[Individual]) -> List[Individual]:
+        """
+        Keep the uncached offspring that look most promising on the coarse
+        evaluator (by coarse rank, then crowding); offspring whose exact
+        objectives are already cached pass through unscreened. Survivors
+        must be evaluated with evaluate() afterwards.
+        """
+        if self.coarse_evaluator is None:
+            return offspring
+
+        fresh = [ind for ind in offspring if route_key(ind.routes) not in self.cache]
+        if not fresh:
+            return offspring
+
+        for ind in fresh:
+            rs = ind.as_routeset()
+            ind.f1_att = self.coarse_evaluator.average_travel_time(rs)
+            ind.f2_trt = self.coarse_evaluator.total_route_time(rs)
+
+        self.assign_rank_and_crowding(fresh)
+        n_keep = max(1, round(self.refine_fraction * len(fresh)))
+        dropped = {id(ind) for ind in sorted(fresh, key=lambda x: (x.rank, -x.crowding))[n_keep:]}
+        return [ind for ind in offspring if id(ind) not in dropped]
+
+    def front_hypervolume(self, pop: List[Individual]) -> float:
+        """
+        Hypervolume of the (ATT, TRT) first front of a ranked population.
+        """
+        if self.hv_reference is None:
+            # fixed once a fully served solution exists, so values stay
+            # comparable across generations
+            served = [p for p in pop if self.is_served(p)]
+            if not served:
+                return 0.0
+            self.hv_reference = (
+                max(p.f1_att for p in served) * 1.1,
+                max(p.f2_trt for p in served) * 1.1,
+            )
+
+        points = [(p.f1_att, p.f2_trt) for p in pop if p.rank == 0]
+        return hypervolume_2d(points, self.hv_reference)
+
+    def is_served(self, ind: Individual) -> bool:
+        """
+        Whether all OD demand has a path on ind's routes (cached).
+        """
+        key = route_key(ind.routes)
+        if key not in self.served:
+            self.served[key] = self.evaluator.unserved_demand(ind.as_routeset()) == 0
+        return self.served[key]
+
+    def stagnated(self) -> bool:
+        if self.patience is None or len(self.hv_history) <= self.patience:
+            return False
+        base = self.hv_history[-self.patience - 1]
+        if base <= 0:
+            return False
+        return self.hv_history[-1] - base <= self.hv_tol * base
+
+    def fingerprint(self, candidates: List[Route]) -> dict:
+        """
+        Settings a checkpoint must match to be resumed: everything that
+        changes the search or the cached objectives. generations is left
+        out so a finished run can be extended.
+        """
+        coarse = self.coarse_evaluator
+        return {
+            "candidates": sorted(tuple(r.stops) for r in candidates),
+            "pop_size": self.pop_size,
+            "max_routes": self.max_routes,
+            "crossover_rate": self.crossover_rate,
+            "mutation_rate": self.mutation_rate,
+            "seed": self.seed,
+            "transfer_penalty": self.evaluator.transfer_penalty,
+            "unreachable_penalty": self.evaluator.unreachable_penalty,
+            "engine": self.evaluator.engine,
+            "incremental": self.incremental,
+            "coarse": None if coarse is None else {
+                "zone_of": (
+                    list(coarse.zoning.zone_of)
+                    if isinstance(coarse, CoarseEvaluator) else None
+                ),
+                "transfer_penalty": coarse.transfer_penalty,
+                "unreachable_penalty": coarse.unreachable_penalty,
+                "refine_fraction": self.refine_fraction,
+            },
+        }
+
+    def save_checkpoint(self, pop: List[Individual], candidates: List[Route]) -> None:
+        """
+        Write population, evaluation cache and RNG state to checkpoint_path.
+        """
+        state = {
+            "fingerprint": self.fingerprint(candidates),
+            "generation": self.generations_run,
+            "population": pop,
+            "cache": self.cache,
+            "rng_state": random.getstate(),
+            "hv_history": self.hv_history,
+            "hv_reference": self.hv_reference,
+            "served": self.served,
+            "archive": self.archive,
+        }
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def load_checkpoint(self, candidates: List[Route]) -> List[Individual]:
+        """
+        Restore optimizer state from checkpoint_path and return the population.
+        Raises ValueError if the checkpoint belongs to a different run setup.
+        """
+        with open(self.checkpoint_path, "rb") as f:
+            state = pickle.load(f)
+        saved = state.get("fingerprint") or {}
+        current = self.fingerprint(candidates)
+        mismatched = sorted(k for k in current if saved.get(k) != current[k])
+        if mismatched:
+            raise ValueError(
+                f"Checkpoint {self.checkpoint_path} was written for a different "
+                f"run setup (mismatched: {', '.join(mismatched)})"
+            )
+        self.generations_run = state["generation"]
+        self.cache = state["cache"]
+        self.hv_history = state["hv_history"]
+        self.hv_reference = state["hv_reference"]
+        self.served = state["served"]
+        self.archive = state["archive"]
+        random.setstate(state["rng_state"])
+        return state["population"]
 
     def init_population(self, candidates: List[Route]) -> List[Individual]:
         pop = []
@@ -181,8 +483,9 @@ class NSGA2Optimizer:
 
             if random.random() < self.crossover_rate:
                 child = crossover(p1, p2, self.max_routes)
+                child.parents = (p1, p2)
             else:
-                child = Individual(routes=p1.routes[:])
+                child = Individual(routes=p1.routes[:], parents=(p1,))
 
             if random.random() < self.mutation_rate:
                 mutate(child, candidates, self.max_routes)
@@ -203,22 +506,47 @@ class NSGA2Optimizer:
                 next_pop.extend(f_sorted[: self.pop_size - len(next_pop)])
                 break
 
+        # lineage state is only needed by individuals that can still be parents
+        survivors = {id(p) for p in next_pop}
+        for ind in combined:
+            if id(ind) not in survivors:
+                ind.times = None
+                ind.used = None
+
         return next_pop
 
-    def solve(self, candidates: List[Route]) -> List[Individual]:
-        pop = self.init_population(candidates)
-        for ind in pop:
-            self.evaluate(ind)
+    def solve(self, candidates: List[Route], resume: bool = False) -> List[Individual]:
+        """
+        Run NSGA-II. With resume=True and an existing checkpoint of the same
+        setup, continue from the saved generation instead of starting over.
+        """
+        if resume and self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            pop = self.load_checkpoint(candidates)
+        else:
+            pop = self.init_population(candidates)
+            for ind in pop:
+                self.evaluate(ind)
 
-        pop = self.select_next_generation(pop)
+            pop = self.select_next_generation(pop)
+            self.generations_run = 0
+            self.hv_history = [self.front_hypervolume(pop)]
 
-        for _ in range(self.generations):
-            offspring = self.make_offspring(pop, candidates)
+        while self.generations_run < self.generations and not self.stagnated():
+            offspring = self.screen(self.make_offspring(pop, candidates))
             for ind in offspring:
                 self.evaluate(ind)
 
             combined = pop + offspring
             pop = self.select_next_generation(combined)
+            self.generations_run += 1
+            self.hv_history.append(self.front_hypervolume(pop))
+
+            if self.checkpoint_path and (
+                self.generations_run % self.checkpoint_every == 0
+                or self.generations_run == self.generations
+                or self.stagnated()
+            ):
+                self.save_checkpoint(pop, candidates)
 
         # return the final nondominated front (approx Pareto set)
         fronts = self.assign_rank_and_crowding(pop)